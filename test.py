@@ -1,9 +1,18 @@
 import unittest
 import os
+import shutil
 import tempfile
 import sys
+from contextlib import redirect_stdout
 from io import StringIO
-from vcleaner import count_words, clean_text_file, show_hidden_chars, main
+from unittest import mock
+from vcleaner import (
+    analyze,
+    count_words,
+    clean_text_file,
+    show_hidden_chars,
+    main,
+)
 
 
 class TestCountWords(unittest.TestCase):
@@ -42,19 +51,20 @@ class TestCleanTextFile(unittest.TestCase):
     Tests for the clean_text_file function
     """
     
-    def setUp(self) -> None:
-        """Create temporary directory for test files"""
-        self.test_dir = tempfile.mkdtemp()
-        self.input_file = os.path.join(self.test_dir, "input.txt")
-        self.output_file = os.path.join(self.test_dir, "output.txt")
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create one temporary directory shared by the tests of the class"""
+        cls.test_dir = tempfile.mkdtemp()
     
-    def tearDown(self) -> None:
-        """Clean up temporary files"""
-        if os.path.exists(self.input_file):
-            os.remove(self.input_file)
-        if os.path.exists(self.output_file):
-            os.remove(self.output_file)
-        os.rmdir(self.test_dir)
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the temporary directory with all test files"""
+        shutil.rmtree(cls.test_dir)
+    
+    def setUp(self) -> None:
+        """Use file names unique to the test"""
+        self.input_file = os.path.join(self.test_dir, f"in_{self.id()}.txt")
+        self.output_file = os.path.join(self.test_dir, f"out_{self.id()}.txt")
     
     def test_clean_text_with_hidden_chars(self) -> None:
         """Test cleaning text that contains hidden characters"""
@@ -126,14 +136,128 @@ class TestCleanTextFile(unittest.TestCase):
         
         self.assertEqual(result, "helloworldtestend")
     
+    def test_clean_text_across_chunks(self) -> None:
+        """Test that cleaning gives the same result when read in small chunks"""
+        test_content = "hello\u200bworld \u00e9t\u00e9 test\nend"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            with mock.patch("vcleaner._CHUNK_SIZE", 3):
+                clean_text_file(self.input_file, self.output_file)
+        
+        output = captured_output.getvalue()
+        
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            result = f.read()
+        
+        self.assertEqual(result, "helloworld t test\nend")
+        self.assertIn("Original length: 24 characters", output)
+        self.assertIn("Number of Words: 4", output)
+        self.assertIn("Words count: 4", output)
+    
+    def test_clean_text_in_place(self) -> None:
+        """Test cleaning a file larger than one chunk into itself"""
+        test_content = "hello\u200bworld \u00e9t\u00e9 test\nend"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            with mock.patch("vcleaner._CHUNK_SIZE", 3):
+                clean_text_file(self.input_file, self.input_file)
+        
+        output = captured_output.getvalue()
+        
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            result = f.read()
+        
+        self.assertEqual(result, "helloworld t test\nend")
+        self.assertIn("Original length: 24 characters", output)
+        leftovers = [n for n in os.listdir(self.test_dir) if n.startswith("tmp")]
+        self.assertEqual(leftovers, [])
+    
+    def test_clean_text_already_clean_in_place(self) -> None:
+        """Test cleaning an already clean file into itself"""
+        test_content = "hello world test"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            clean_text_file(self.input_file, self.input_file)
+        
+        output = captured_output.getvalue()
+        
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            result = f.read()
+        
+        self.assertEqual(result, test_content)
+        self.assertNotIn("Error", output)
+    
+    def test_clean_text_large_clean_file(self) -> None:
+        """Test that a clean file larger than one chunk is copied byte for byte"""
+        test_content = b"hello world\r\n\ttest line\n" * 4
+        
+        with open(self.input_file, "wb") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            with mock.patch("vcleaner._CHUNK_SIZE", 5):
+                clean_text_file(self.input_file, self.output_file)
+        
+        output = captured_output.getvalue()
+        
+        with open(self.output_file, "rb") as f:
+            result = f.read()
+        
+        self.assertEqual(result, test_content)
+        self.assertIn("Invisible characters removed: 0", output)
+        self.assertIn("Words count: 16", output)
+    
+    def test_clean_text_large_file_read_once(self) -> None:
+        """Test that a file larger than one chunk is opened only once"""
+        test_content = b"hello world test line\n" * 4 + b"\x01"
+        
+        with open(self.input_file, "wb") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()):
+            with mock.patch("vcleaner._CHUNK_SIZE", 5):
+                with mock.patch("builtins.open", wraps=open) as mock_open:
+                    clean_text_file(self.input_file, self.output_file)
+        
+        input_opens = [
+            call for call in mock_open.call_args_list
+            if call.args[0] == self.input_file
+        ]
+        self.assertEqual(len(input_opens), 1)
+    
+    def test_clean_text_large_file(self) -> None:
+        """Test cleaning a file larger than one chunk with many hidden characters"""
+        test_content = "word\u200b " * 300000
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            clean_text_file(self.input_file, self.output_file)
+        
+        output = captured_output.getvalue()
+        
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            result = f.read()
+        
+        self.assertEqual(result, "word " * 300000)
+        self.assertIn("Invisible characters removed: 300000", output)
+        self.assertIn("Words count: 300000", output)
+    
     def test_clean_text_file_not_found(self) -> None:
         """Test handling of non-existent input file"""
-        captured_output = StringIO()
-        sys.stdout = captured_output
+        with redirect_stdout(StringIO()) as captured_output:
+            clean_text_file("nonexistent.txt", self.output_file)
         
-        clean_text_file("nonexistent.txt", self.output_file)
-        
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("Error: File 'nonexistent.txt' not found!", output)
@@ -144,16 +268,19 @@ class TestShowHiddenChars(unittest.TestCase):
     Tests for the show_hidden_chars function
     """
     
-    def setUp(self) -> None:
-        """Create temporary directory for test files"""
-        self.test_dir = tempfile.mkdtemp()
-        self.input_file = os.path.join(self.test_dir, "input.txt")
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create one temporary directory shared by the tests of the class"""
+        cls.test_dir = tempfile.mkdtemp()
     
-    def tearDown(self) -> None:
-        """Clean up temporary files"""
-        if os.path.exists(self.input_file):
-            os.remove(self.input_file)
-        os.rmdir(self.test_dir)
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the temporary directory with all test files"""
+        shutil.rmtree(cls.test_dir)
+    
+    def setUp(self) -> None:
+        """Use a file name unique to the test"""
+        self.input_file = os.path.join(self.test_dir, f"in_{self.id()}.txt")
     
     def test_show_hidden_chars_with_hidden(self) -> None:
         """Test showing hidden characters when they exist"""
@@ -162,17 +289,31 @@ class TestShowHiddenChars(unittest.TestCase):
         with open(self.input_file, "w", encoding="utf-8") as f:
             f.write(test_content)
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        show_hidden_chars(self.input_file)
+        with redirect_stdout(StringIO()) as captured_output:
+            show_hidden_chars(self.input_file)
         
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("Invisible characters found:", output)
         self.assertIn("Total Invisible Characters:", output)
     
+    def test_show_hidden_chars_ascii_control_only(self) -> None:
+        """Test showing hidden characters when all of them are ASCII control bytes"""
+        test_content = "a\x00b\x07c\x00"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            show_hidden_chars(self.input_file)
+        
+        output = captured_output.getvalue()
+        
+        nul = output.index("Find (ASCII 0): 2 characters")
+        bel = output.index("Find (ASCII 7): 1 characters")
+        self.assertLess(nul, bel)
+        self.assertIn("Total Invisible Characters: 3 characters", output)
+    
     def test_show_hidden_chars_clean_file(self) -> None:
         """Test showing hidden characters when file is clean"""
         test_content = "hello world test"
@@ -180,64 +321,157 @@ class TestShowHiddenChars(unittest.TestCase):
         with open(self.input_file, "w", encoding="utf-8") as f:
             f.write(test_content)
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
+        with redirect_stdout(StringIO()) as captured_output:
+            show_hidden_chars(self.input_file)
         
-        show_hidden_chars(self.input_file)
+        output = captured_output.getvalue()
+        
+        self.assertIn("No hidden characters found!", output)
+    
+    def test_show_hidden_chars_after_file_changes(self) -> None:
+        """Test that a rewritten file is read again instead of served from cache"""
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write("hello world")
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            show_hidden_chars(self.input_file)
+            
+            mtime_ns = os.stat(self.input_file).st_mtime_ns
+            
+            # Same size, so only the modification time tells the files apart
+            with open(self.input_file, "w", encoding="utf-8") as f:
+                f.write("hello\x00world")
+            
+            os.utime(self.input_file, ns=(mtime_ns, mtime_ns + 1_000_000))
+            
+            show_hidden_chars(self.input_file)
         
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("No hidden characters found!", output)
+        self.assertIn("Find (ASCII 0): 1 characters", output)
     
     def test_show_hidden_chars_file_not_found(self) -> None:
         """Test handling of non-existent file"""
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        show_hidden_chars("nonexistent.txt")
+        with redirect_stdout(StringIO()) as captured_output:
+            show_hidden_chars("nonexistent.txt")
         
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("Error: File 'nonexistent.txt' not found!", output)
 
 
+class TestAnalyze(unittest.TestCase):
+    """
+    Tests for the analyze function
+    """
+    
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create one temporary directory shared by the tests of the class"""
+        cls.test_dir = tempfile.mkdtemp()
+    
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the temporary directory with all test files"""
+        shutil.rmtree(cls.test_dir)
+    
+    def setUp(self) -> None:
+        """Use file names unique to the test"""
+        self.input_file = os.path.join(self.test_dir, f"in_{self.id()}.txt")
+        self.output_file = os.path.join(self.test_dir, f"out_{self.id()}.txt")
+    
+    def test_analyze_collects_all_statistics(self) -> None:
+        """Test that one call gives the show and clean statistics"""
+        test_content = "hello\u200bworld\u00a0test\x00"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        result = analyze(self.input_file)
+        
+        self.assertEqual(result.original_length, 17)
+        self.assertEqual(result.original_words, 2)
+        self.assertEqual(result.cleaned_length, 14)
+        self.assertEqual(result.cleaned_words, 1)
+        self.assertEqual(result.hidden_count, 3)
+        self.assertEqual(
+            dict(result.hidden_chars), {"\u200b": 1, "\u00a0": 1, "\x00": 1}
+        )
+        self.assertFalse(os.path.exists(self.output_file))
+    
+    def test_analyze_writes_output_file(self) -> None:
+        """Test that the cleaned text is saved when an output file is given"""
+        test_content = "hello\u200b world"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        result = analyze(self.input_file, self.output_file)
+        
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            cleaned = f.read()
+        
+        self.assertEqual(cleaned, "hello world")
+        self.assertEqual(result.cleaned_words, 2)
+    
+    def test_analyze_reads_large_file_once(self) -> None:
+        """Test that a file larger than one chunk is opened only once"""
+        test_content = b"hello world\n" * 4 + b"\x01"
+        
+        with open(self.input_file, "wb") as f:
+            f.write(test_content)
+        
+        with mock.patch("vcleaner._CHUNK_SIZE", 5):
+            with mock.patch("builtins.open", wraps=open) as mock_open:
+                result = analyze(self.input_file, self.output_file)
+        
+        input_opens = [
+            call for call in mock_open.call_args_list
+            if call.args[0] == self.input_file
+        ]
+        self.assertEqual(len(input_opens), 1)
+        self.assertEqual(result.hidden_chars, {"\x01": 1})
+        self.assertEqual(result.cleaned_words, 8)
+
+
 class TestMain(unittest.TestCase):
     """
     Tests for the main function
     """
     
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create one temporary directory shared by the tests of the class"""
+        cls.test_dir = tempfile.mkdtemp()
+    
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the temporary directory with all test files"""
+        shutil.rmtree(cls.test_dir)
+    
     def setUp(self) -> None:
-        """Save original sys.argv"""
+        """Save original sys.argv and use file names unique to the test"""
         self.original_argv = sys.argv.copy()
-        self.test_dir = tempfile.mkdtemp()
-        self.input_file = os.path.join(self.test_dir, "input.txt")
-        self.output_file = os.path.join(self.test_dir, "output.txt")
+        self.input_file = os.path.join(self.test_dir, f"in_{self.id()}.txt")
+        self.output_file = os.path.join(self.test_dir, f"out_{self.id()}.txt")
     
     def tearDown(self) -> None:
-        """Restore original sys.argv and clean up"""
+        """Restore original sys.argv"""
         sys.argv = self.original_argv
-        if os.path.exists(self.input_file):
-            os.remove(self.input_file)
-        if os.path.exists(self.output_file):
-            os.remove(self.output_file)
-        os.rmdir(self.test_dir)
     
     def test_main_no_arguments(self) -> None:
         """Test main function with no arguments"""
         sys.argv = ["vcleaner.py"]
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        result = main()
+        with redirect_stdout(StringIO()) as captured_output:
+            result = main()
         
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertEqual(result, 1)
         self.assertIn("Usage:", output)
+        self.assertIn("both <input_file>", output)
     
     def test_main_clean_command(self) -> None:
         """Test main function with clean command"""
@@ -262,25 +496,40 @@ class TestMain(unittest.TestCase):
         
         sys.argv = ["vcleaner.py", "show", self.input_file]
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
+        with redirect_stdout(StringIO()):
+            result = main()
         
-        result = main()
+        self.assertEqual(result, 0)
+    
+    def test_main_both_command(self) -> None:
+        """Test main function with both command"""
+        test_content = "hello\u200bworld"
+        
+        with open(self.input_file, "w", encoding="utf-8") as f:
+            f.write(test_content)
+        
+        sys.argv = ["vcleaner.py", "both", self.input_file, self.output_file]
+        
+        with redirect_stdout(StringIO()) as captured_output:
+            result = main()
         
-        sys.stdout = sys.__stdout__
+        output = captured_output.getvalue()
+        
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            cleaned = f.read()
         
         self.assertEqual(result, 0)
+        self.assertEqual(cleaned, "helloworld")
+        self.assertIn("Invisible characters found:", output)
+        self.assertIn("Clean version of file saved to:", output)
     
     def test_main_unknown_command(self) -> None:
         """Test main function with unknown command"""
         sys.argv = ["vcleaner.py", "unknown"]
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
+        with redirect_stdout(StringIO()) as captured_output:
+            result = main()
         
-        result = main()
-        
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertEqual(result, 1)
@@ -290,12 +539,9 @@ class TestMain(unittest.TestCase):
         """Test clean command without input file"""
         sys.argv = ["vcleaner.py", "clean"]
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
+        with redirect_stdout(StringIO()) as captured_output:
+            main()
         
-        main()
-        
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("Error: Specify input file", output)
@@ -304,12 +550,9 @@ class TestMain(unittest.TestCase):
         """Test show command without input file"""
         sys.argv = ["vcleaner.py", "show"]
         
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        main()
+        with redirect_stdout(StringIO()) as captured_output:
+            main()
         
-        sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         self.assertIn("Error: Specify input file", output)
@@ -321,7 +564,7 @@ def run_tests() -> int:
     """
     loader = unittest.TestLoader()
     suite = loader.loadTestsFromModule(sys.modules[__name__])
-    runner = unittest.TextTestRunner(verbosity=2)
+    runner = unittest.TextTestRunner(verbosity=2, buffer=True)
     result = runner.run(suite)
     
     return 0 if result.wasSuccessful() else 1
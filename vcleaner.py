@@ -1,55 +1,296 @@
+import codecs
+import functools
+import io
+import os
 import sys
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 
 
 HELP_TEXT: str = """Usage:
 \tpython script.py show <input_file>
 \tpython script.py clean <input_file> [output_file]
+\tpython script.py both <input_file> [output_file]
 Example:
 \tpython script.py clean dirty.txt clean.txt
 \tpython script.py show dirty.txt
+\tpython script.py both dirty.txt clean.txt
 """
 
+# Control characters kept by the cleaner: tab, LF and CR
+_CR_LF_TAB: frozenset[int] = frozenset((9, 10, 13))
 
-def count_words(text: str) -> int:
+# Lookup table indexed by byte value: 1 for bytes kept by the cleaner
+# (printable ASCII plus tab, LF and CR), 0 for hidden ones. Every other
+# table and pattern below is derived from it.
+_KEEP_LUT: bytes = bytes(
+    1 if (32 <= i <= 126 or i in _CR_LF_TAB) else 0 for i in range(256)
+)
+
+# Kept and hidden byte values, for bytes.translate(None, delete=...).
+# Bytes >= 128 are always hidden, so the whole multibyte UTF-8 sequence
+# of a non-ASCII character is deleted with them.
+_KEEP_BYTES: bytes = bytes(i for i in range(256) if _KEEP_LUT[i])
+_HIDDEN_BYTES: bytes = bytes(i for i in range(256) if not _KEEP_LUT[i])
+
+# Regex matching any single character that is not kept. Kept
+# as source and compiled where used, so importing the module (or running
+# a subcommand that never searches) does not pay for importing re.
+_HIDDEN_PATTERN: str = "[^" + "".join(f"\\x{i:02x}" for i in _KEEP_BYTES) + "]"
+
+# Files are processed in chunks of this many bytes
+_CHUNK_SIZE: int = 1 << 20
+
+
+def count_words(text: str | bytes) -> int:
     words = text.split()
     return len(words)
 
 
-def clean_text_file(input_file: str, output_file: str) -> None:
+def _count_chunk_words(
+    text: str | bytes, in_word: bool, words: int | None = None
+) -> tuple[int, bool]:
     """
-    Reads a text file, removes hidden/non-ASCII characters,
-    and saves clean ASCII text to output file.
+    Counts words in one chunk of a stream, skipping a word carried over
+    from the previous chunk. Returns the count and whether the chunk
+    ends inside a word. A count already taken with count_words(text)
+    can be passed as words to avoid splitting the chunk again
+    """
+    if not text:
+        return 0, in_word
+    if words is None:
+        words = count_words(text)
+    if in_word and not text[:1].isspace():
+        words -= 1
+    return words, not text[-1:].isspace()
+
+
+@functools.lru_cache(maxsize=4)
+def _read_cached(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Reads a whole file; modification time and size are part of the
+    cache key so a changed file is read again. Only files of at most
+    one chunk are cached, so the cache holds at most 4 MiB
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _stream_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            yield chunk
+
+
+def _read_chunks(path: str) -> Iterable[bytes]:
+    """
+    Returns the contents of a file as an iterable of byte chunks.
+    Files that fit in one chunk go through the read cache, so reading
+    an unchanged file again costs a single stat() call
+    """
+    st = os.stat(path)
+    if st.st_size <= _CHUNK_SIZE:
+        return (_read_cached(path, st.st_mtime_ns, st.st_size),)
+    return _stream_file(path)
+
+
+def _is_same_file(path: str, other: str) -> bool:
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+@contextmanager
+def _open_output(
+    input_file: str, output_file: str | None
+) -> Iterator[io.BufferedWriter | None]:
+    """
+    Opens output file for writing, or yields None when there is none.
+    When it is the input file itself, the text goes to a temporary file
+    in the same directory that replaces the input once it has been read
+    in full
     """
+    if output_file is None:
+        yield None
+        return
+
+    if not _is_same_file(input_file, output_file):
+        with open(output_file, "wb") as out:
+            yield out
+        return
+
+    import shutil
+    import tempfile
+
+    fd, temp_file = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(output_file))
+    )
     try:
-        with open(input_file, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
+        with os.fdopen(fd, "wb") as out:
+            yield out
+        shutil.copymode(input_file, temp_file)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
+def _clean_file_stats(path: str) -> tuple[int, int] | None:
+    """
+    Returns the length and word count of a file that fits in one chunk
+    and has no hidden characters, where every byte is one character.
+    Returns None for any other file
+    """
+    st = os.stat(path)
+    if st.st_size > _CHUNK_SIZE:
+        return None
+    data = _read_cached(path, st.st_mtime_ns, st.st_size)
+    if len(data.translate(None, _HIDDEN_BYTES)) != len(data):
+        return None
+    return len(data), count_words(data)
+
+
+def _count_hidden_chars(
+    chunk: bytes, content: str, hidden_chars: Counter[str]
+) -> None:
+    """
+    Adds the hidden characters of a chunk and its decoded text to
+    hidden_chars
+    """
+    hidden = chunk.translate(None, _KEEP_BYTES)
+    if hidden.isascii():
+        # Only ASCII control bytes are hidden here, so a byte
+        # histogram gives the characters without running the regex
+        for byte, count in Counter(hidden).items():
+            hidden_chars[chr(byte)] += count
+    else:
+        import re
+
+        hidden_chars.update(re.findall(_HIDDEN_PATTERN, content))
+
+
+class AnalysisResult:
+    """
+    Statistics collected by analyze() in a single pass over a file
+    """
+
+    __slots__ = (
+        "original_length",
+        "original_words",
+        "cleaned_length",
+        "cleaned_words",
+        "hidden_chars",
+    )
+
+    def __init__(self) -> None:
+        self.original_length: int = 0
+        self.original_words: int = 0
+        self.cleaned_length: int = 0
+        self.cleaned_words: int = 0
+        self.hidden_chars: Counter[str] = Counter()
+
+    @property
+    def hidden_count(self) -> int:
+        return self.original_length - self.cleaned_length
 
-        original_length = len(content)
-        original_words = count_words(content)
 
-        print(f"\nOriginal length: {original_length} characters")
-        print(f"Number of Words: {original_words}")
+def analyze(
+    input_file: str, output_file: str | None = None, count_hidden: bool = True
+) -> AnalysisResult:
+    """
+    Scans a text file once and collects its statistics before and after
+    cleaning. If output_file is given, the cleaned text is saved to it.
+    With count_hidden, also tallies every hidden character found
+    """
+    result = AnalysisResult()
+
+    clean_stats = _clean_file_stats(input_file) if output_file is not None else None
+    if clean_stats is not None:
+        # Nothing to remove, let the OS copy the file as is. Cleaning
+        # a clean file into itself leaves nothing to do. Only files of
+        # one chunk are checked, as they are read through the cache; a
+        # check of a larger file would read it twice.
+        import shutil
 
-        cleaned = ""
-        hidden_count = 0
-        for char in content:
-            ascii_val = ord(char)
-            if (32 <= ascii_val <= 126) or ascii_val in [9, 10, 13]:
-                cleaned += char
+        length, words = clean_stats
+        if not _is_same_file(input_file, output_file):
+            shutil.copyfile(input_file, output_file)
+        result.original_length = result.cleaned_length = length
+        result.original_words = result.cleaned_words = words
+        return result
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    in_word = in_cleaned_word = False
+
+    chunks = _read_chunks(input_file)
+    with _open_output(input_file, output_file) as out:
+        for chunk in chunks:
+            cleaned = chunk.translate(None, _HIDDEN_BYTES)
+            is_clean = len(cleaned) == len(chunk)
+            if is_clean:
+                # Visible ASCII only, so every byte is one character and
+                # the bytes can be counted without decoding. Dropping a
+                # partial sequence left over from the previous chunk is
+                # what decode() would have done with it.
+                decoder.reset()
+                content: str | bytes = chunk
             else:
-                hidden_count += 1
+                content = decoder.decode(chunk)
+                if count_hidden:
+                    _count_hidden_chars(chunk, content, result.hidden_chars)
+            chunk_words = count_words(content)
+            result.original_length += len(content)
+            words, in_word = _count_chunk_words(content, in_word, chunk_words)
+            result.original_words += words
+
+            if not is_clean:
+                # Removed characters may have joined or split words
+                chunk_words = None
+            result.cleaned_length += len(cleaned)
+            words, in_cleaned_word = _count_chunk_words(
+                cleaned, in_cleaned_word, chunk_words
+            )
+            result.cleaned_words += words
+            if out is not None:
+                out.write(cleaned)
+
+    result.original_length += len(decoder.decode(b"", final=True))
+    return result
+
+
+def _print_clean_report(result: AnalysisResult, output_file: str) -> None:
+    print(f"\nOriginal length: {result.original_length} characters")
+    print(f"Number of Words: {result.original_words}")
+    print(f"Cleaned Length: {result.cleaned_length} characters")
+    print(f"Invisible characters removed: {result.hidden_count}")
+    print(f"Words count: {result.cleaned_words}")
+    print(f"Clean version of file saved to: {output_file}\n")
+
+
+def _print_show_report(result: AnalysisResult) -> None:
+    print()
+    if result.hidden_chars:
+        print("Invisible characters found:")
+        for char, count in result.hidden_chars.most_common():
+            print(f"  Find (ASCII {ord(char)}): {count} characters")
+        print(f" Total Invisible Characters: {result.hidden_count} characters")
+    else:
+        print("No hidden characters found! Your file is clean")
 
-        cleaned_length = len(cleaned)
-        cleaned_words = count_words(cleaned)
-        hidden_removed = hidden_count
+    print(f"  Original Length: {result.original_length}")
+    print(f"  Number of Words: {result.original_words}\n")
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(cleaned)
 
-        print(f"Cleaned Length: {cleaned_length} characters")
-        print(f"Invisible characters removed: {hidden_removed}")
-        print(f"Words count: {cleaned_words}")
-        print(f"Clean version of file saved to: {output_file}\n")
+def clean_text_file(input_file: str, output_file: str) -> None:
+    """
+    Reads a text file, removes hidden/non-ASCII characters,
+    and saves clean ASCII text to output file.
+    """
+    try:
+        result = analyze(input_file, output_file, count_hidden=False)
+        _print_clean_report(result, output_file)
 
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found!")
@@ -62,39 +303,67 @@ def show_hidden_chars(input_file: str) -> None:
     Shows what hidden characters are in the file (for debugging)
     """
     try:
-        with open(input_file, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-
-        original_length = len(content)
-        original_words = count_words(content)
-
-        hidden_chars = {}
-        total_hidden = 0
-
-        for char in content:
-            ascii_val = ord(char)
-            if not ((32 <= ascii_val <= 126) or ascii_val in [9, 10, 13]):
-                if char not in hidden_chars:
-                    hidden_chars[char] = 0
-                hidden_chars[char] += 1
-                total_hidden += 1
-
-        print()
-        if hidden_chars:
-            print("Invisible characters found:")
-            for char, count in sorted(
-                hidden_chars.items(), key=lambda x: x[1], reverse=True
-            ):
-                print(f"  Find (ASCII {ord(char)}): {count} characters")
-            print(f" Total Invisible Characters: {total_hidden} characters")
-        else:
-            print("No hidden characters found! Your file is clean")
-
-        print(f"  Original Length: {original_length}")
-        print(f"  Number of Words: {original_words}\n")
+        result = analyze(input_file)
+        _print_show_report(result)
+
+    except FileNotFoundError:
+        print(f"Error: File '{input_file}' not found!")
+
+
+def show_and_clean(input_file: str, output_file: str) -> None:
+    """
+    Shows the hidden characters of a text file and saves its clean
+    version, scanning the file only once
+    """
+    try:
+        result = analyze(input_file, output_file)
+        _print_show_report(result)
+        _print_clean_report(result, output_file)
 
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found!")
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+def _cmd_clean(argv: list[str]) -> int:
+    if len(argv) < 3:
+        print("Error: Specify input file")
+    else:
+        input_file = argv[2]
+        output_file = argv[3] if len(argv) > 3 else "cleaned_" + input_file
+        clean_text_file(input_file, output_file)
+    return 0
+
+
+def _cmd_show(argv: list[str]) -> int:
+    if len(argv) < 3:
+        print("Error: Specify input file")
+    else:
+        show_hidden_chars(argv[2])
+    return 0
+
+
+def _cmd_both(argv: list[str]) -> int:
+    if len(argv) < 3:
+        print("Error: Specify input file")
+    else:
+        input_file = argv[2]
+        output_file = argv[3] if len(argv) > 3 else "cleaned_" + input_file
+        show_and_clean(input_file, output_file)
+    return 0
+
+
+def _cmd_unknown(argv: list[str]) -> int:
+    print("Unknown command. Use 'clean', 'show' or 'both'")
+    return 1
+
+
+_COMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "clean": _cmd_clean,
+    "show": _cmd_show,
+    "both": _cmd_both,
+}
 
 
 def main() -> int:
@@ -102,28 +371,8 @@ def main() -> int:
         print(HELP_TEXT)
         return 1
 
-    match sys.argv[1]:
-        case "clean":
-            if len(sys.argv) < 3:
-                print("Error: Specify input file")
-            else:
-                input_file = sys.argv[2]
-                output_file = (
-                    sys.argv[3] if len(sys.argv) > 3 else "cleaned_" + input_file
-                )
-                clean_text_file(input_file, output_file)
-        
-        case "show":
-            if len(sys.argv) < 3:
-                print("Error: Specify input file")
-            else:
-                show_hidden_chars(sys.argv[2])
-
-        case _:
-            print("Unknown command. Use 'clean' or 'show'")
-            return 1
-    
-    return 0
+    command = _COMMANDS.get(sys.argv[1], _cmd_unknown)
+    return command(sys.argv)
 
 
 if __name__ == "__main__":